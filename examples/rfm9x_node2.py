@@ -5,9 +5,6 @@
 # Author: Jerry Needell
 #
 import time
-import board
-import busio
-import digitalio
 import argparse
 
 parser = argparse.ArgumentParser()
@@ -26,6 +23,11 @@ if args.simulate:
     from simulated_rfm9x import SimulatedRFM9x
     rfm9x = SimulatedRFM9x(frequency=RADIO_FREQ_MHZ)
 else:
+    # Hardware stack imported only when not simulating: pulling in
+    # Blinka probes SPI and costs hundreds of ms on a Pi
+    import board
+    import busio
+    import digitalio
     import adafruit_rfm9x
     # Define pins connected to the chip.
     CS = digitalio.DigitalInOut(board.CE1)
@@ -3,9 +3,6 @@
 
 # Simple demo of sending and recieving data with the RFM95 LoRa radio.
 # Author: Tony DiCola
-import board
-import busio
-import digitalio
 import argparse
 
 parser = argparse.ArgumentParser()
@@ -25,6 +22,11 @@ if args.simulate:
     from simulated_rfm9x import SimulatedRFM9x
     rfm9x = SimulatedRFM9x(frequency=RADIO_FREQ_MHZ)
 else:
+    # Hardware stack imported only when not simulating: pulling in
+    # Blinka probes SPI and costs hundreds of ms on a Pi
+    import board
+    import busio
+    import digitalio
     import adafruit_rfm9x
     # Define pins connected to the chip, use these if wiring up the breakout according to the guide:
     CS = digitalio.DigitalInOut(board.D5)
@@ -33,10 +33,19 @@ def run_tx(rfm9x, interval=5, broadcast=True):
     Transmit MESSAGE at given interval. Optionally broadcast to all.
     """
     print(f"[TX-{rfm9x.node}] Starting transmission loop every {interval}s...")
+    # Schedule against a monotonic deadline so the send/print time does
+    # not accumulate as drift in the TX cadence
+    next_tx = time.monotonic()
     while True:
         print(f"[TX-{rfm9x.node}] Sending: '{MESSAGE}'")
         rfm9x.send(MESSAGE.encode('utf-8'), destination=0xFF if broadcast else rfm9x.destination)
-        time.sleep(interval)
+        next_tx += interval
+        sleep_s = next_tx - time.monotonic()
+        if sleep_s > 0:
+            time.sleep(sleep_s)
+        else:
+            # Fell behind (e.g. slow send); re-anchor instead of bursting
+            next_tx = time.monotonic()
 
 def run_rx(rfm9x):
     """
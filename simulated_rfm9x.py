@@ -18,15 +18,60 @@ Run in simulation mode:
     python ./example/simpletest.py --simulate --id=1
 '''
 
+import re
 import socket
-import json
+import selectors
+import struct
+import sys
+import threading
 import time
 import random
 import binascii
+from collections import deque
+
+try:
+    import orjson as _json
+
+    def _dumps(obj):
+        return _json.dumps(obj)
+except ImportError:
+    import json as _json
+
+    # Reuse one compact encoder: json.dumps builds a fresh JSONEncoder per
+    # call, and the default separators/ASCII escaping cost bytes and time
+    _encode = _json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+    def _dumps(obj):
+        return _encode(obj).encode()
+
+_loads = _json.loads
+
+# 4-byte RadioHead header: destination, node, identifier, flags
+_HEADER = struct.Struct('BBBB')
+
+# MSG_DONTWAIT is POSIX-only (absent on Windows); the kernel-drain loop
+# in _read_frame is skipped when the flag is unavailable
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+# Payload characters that would need JSON escaping; such payloads take
+# the generic serializer path instead of the frame template
+_NEEDS_ESCAPE = re.compile(r'[\\"\x00-\x1f]')
 
 
 class SimulatedRFM9x:
 
+    # Fixed attribute set: saves a per-instance __dict__ and speeds up
+    # attribute access in the send/receive hot paths
+    __slots__ = (
+        'node', 'location', 'frequency', 'destination', 'server',
+        '_registered', 'sock', '_sel', 'tx_power', 'last_rssi', 'last_snr',
+        'enable_crc', 'sequence_number', 'flags', 'identifier',
+        'receive_timeout', 'ack_wait', 'ack_delay', 'ack_retries',
+        '_srtt', '_rttvar', '_keep_listening', '_header_key',
+        '_header_cache', '_rxbuf', '_rxmv', '_rxlen', '_pending_acks',
+        '_log_q', '_log_event', '_log_thread'
+    )
+
     def __init__(self, server_ip='localhost', server_port=5000, frequency=915.0):
         """
         Initialize the simulated RFM9x module.
@@ -43,11 +88,11 @@ class SimulatedRFM9x:
         self.frequency = frequency
         self.destination = 0XFF
         self.server = (server_ip, server_port)
+        self._registered = False  # replayed after an auto-reconnect
 
         # Create and connect TCP socket to simulation server
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.connect(self.server)
-        self.sock.settimeout(0.1)
+        # (AsyncSimulatedRFM9x overrides this to connect on the event loop)
+        self._open_socket()
 
         # Simulated configuration & telemetry
         self.tx_power = 23  # in dBm
@@ -66,21 +111,183 @@ class SimulatedRFM9x:
         self.ack_delay = None
         self.ack_retries = 5
 
+        # Smoothed ACK round-trip estimate (Jacobson/Karels); ack_wait is
+        # only the cold-start timeout until the first sample arrives
+        self._srtt = None
+        self._rttvar = 0.0
+
         self._keep_listening = False  # internal state tracking
 
-    def initialize(self):
-        """Must be called after setting node, location, and frequency."""
-        msg = {
+        # Cached RadioHead-style header, rebuilt only when the addressing
+        # fields actually change (the common TX loop reuses it every send)
+        self._header_key = None
+        self._header_cache = None
+
+        # Receive buffer: one recv() can carry several newline-framed JSON
+        # messages, or a partial one, so frames are split out of here.
+        # Preallocated and filled via recv_into so the RX loop does not
+        # allocate a fresh bytes object per read.
+        self._rxbuf = bytearray(8192)
+        self._rxmv = memoryview(self._rxbuf)
+        self._rxlen = 0
+
+        # ACK frames coalesced from one RX burst, flushed in one sendall
+        self._pending_acks = []
+
+        # Diagnostics ring buffer: the RX path appends, a background
+        # thread writes to stdout so the hot loop never blocks on I/O
+        self._log_q = deque(maxlen=4096)
+        self._log_event = threading.Event()
+        self._log_thread = None
+
+    def _open_socket(self):
+        """Connect the TCP socket to the simulation server."""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Frames are tiny — disable Nagle so ACK round-trips measure the
+        # simulation, not kernel coalescing, and widen the socket buffers
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 131072)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 131072)
+        # Keepalive probes detect a dead server in ~60s instead of letting
+        # a receive loop hang on a half-open connection
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):  # Linux-only tunables
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        self.sock.connect(self.server)
+
+        # epoll-backed selector: receive() sleeps in the kernel until data
+        # actually arrives instead of busy-polling with a short timeout.
+        # The socket itself stays blocking so sendall() never short-writes.
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self.sock, selectors.EVENT_READ)
+
+    def _register_frame(self):
+        return _dumps({
             "type": "register",
             "node_id": self.node,
             "location": self.location,
             "frequency": self.frequency
-        }
-        self.sock.sendall((json.dumps(msg) + '\n').encode())
-    
+        }) + b'\n'
+
+    def initialize(self):
+        """Must be called after setting node, location, and frequency."""
+        self.sock.sendall(self._register_frame())
+        self._registered = True
+
+    def _reconnect(self):
+        """Reopen the server connection and replay the registration."""
+        try:
+            self._sel.close()
+        except Exception:
+            pass
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        # Mark the connection as down *before* reopening: if connect()
+        # raises (server still restarting), the next send/receive retries
+        # the reconnect instead of selecting on a closed epoll object
+        self._sel = None
+        self._rxlen = 0
+        self._pending_acks.clear()
+        self._open_socket()
+        if self._registered:
+            self.sock.sendall(self._register_frame())
+
+    def _sendall(self, buf):
+        """sendall with one transparent reconnect on a broken connection."""
+        if self._sel is None:
+            # A previous reconnect failed mid-way; finish it first
+            self._reconnect()
+        try:
+            self.sock.sendall(buf)
+        except (BrokenPipeError, ConnectionResetError):
+            self._reconnect()
+            self.sock.sendall(buf)
+
     def _crc16(self, data: bytes) -> int:
         return binascii.crc_hqx(data, 0xFFFF)
 
+    def _log(self, text):
+        """Queue a diagnostic line; the drain thread writes it out."""
+        self._log_q.append(text)
+        if self._log_thread is None:
+            self._log_thread = threading.Thread(target=self._drain_log, daemon=True)
+            self._log_thread.start()
+        self._log_event.set()
+
+    def _drain_log(self):
+        """Flush queued diagnostic lines to stdout in batches."""
+        while True:
+            self._log_event.wait()
+            self._log_event.clear()
+            batch = []
+            while self._log_q:
+                batch.append(self._log_q.popleft())
+            if batch:
+                sys.stdout.write('\n'.join(batch) + '\n')
+                sys.stdout.flush()
+
+    def _read_frame(self, timeout):
+        """
+        Return the next newline-delimited frame from the server, or None
+        if no complete frame arrives within `timeout` seconds.
+
+        Keeps any partial or extra data in `self._rxbuf` so bursty traffic
+        (several frames in one recv) is parsed one message at a time.
+        """
+        deadline = time.monotonic() + timeout
+        if self._sel is None:
+            # A previous reconnect failed mid-way; retry it here so an
+            # RX-only node recovers once the server is back, instead of
+            # selecting on a closed epoll object forever
+            self._reconnect()
+        while True:
+            newline = self._rxbuf.find(b'\n', 0, self._rxlen)
+            if newline >= 0:
+                frame = bytes(self._rxmv[:newline])
+                # Shift any leftover bytes down to the start of the buffer
+                tail = bytes(self._rxmv[newline + 1:self._rxlen])
+                self._rxmv[:len(tail)] = tail
+                self._rxlen = len(tail)
+                return frame
+
+            if self._rxlen == len(self._rxbuf):
+                # Frame bigger than the buffer: grow it (rare)
+                grown = bytearray(len(self._rxbuf) * 2)
+                grown[:self._rxlen] = self._rxmv
+                self._rxbuf = grown
+                self._rxmv = memoryview(grown)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if not self._sel.select(remaining):
+                return None
+            try:
+                n = self.sock.recv_into(self._rxmv[self._rxlen:])
+            except ConnectionResetError:
+                self._reconnect()
+                return None
+            if not n:
+                # Server closed the connection; reconnect for the next call
+                self._reconnect()
+                return None
+            self._rxlen += n
+            # Drain any further frames already queued in the kernel so a
+            # burst costs one wakeup instead of one select() per frame
+            while _MSG_DONTWAIT and self._rxlen < len(self._rxbuf):
+                try:
+                    n = self.sock.recv_into(
+                        self._rxmv[self._rxlen:], 0, _MSG_DONTWAIT)
+                except (BlockingIOError, OSError):
+                    break
+                if not n:
+                    break
+                self._rxlen += n
+
     def send(self, data: bytes, *, keep_listening=False, destination=None,
              node=None, identifier=None, flags=None):
         """
@@ -94,33 +301,60 @@ class SimulatedRFM9x:
         - identifier (int): Sequence number for reliable datagrams.
         - flags (int): Bit flags (ACK, retry, etc.).
         """
-        if isinstance(data, bytes):
-            data = data.decode()
-
-        # Build metadata for the RadioHead-style header
-        header = {
-            "destination": destination if destination is not None else self.destination,
-            "node": node if node is not None else self.node,
-            "identifier": identifier if identifier is not None else self.identifier,
-            "flags": flags if flags is not None else self.flags
-        }
+        # CRC runs over the raw payload bytes; the wire field stays str
+        # (one decode here instead of a decode/encode round trip)
+        if isinstance(data, (bytes, bytearray)):
+            payload = bytes(data)
+            data = payload.decode('utf-8')
+        else:
+            payload = data.encode('utf-8')
+
+        # Build metadata for the RadioHead-style header (cached between
+        # sends as long as the addressing fields stay the same)
+        header_key = (
+            destination if destination is not None else self.destination,
+            node if node is not None else self.node,
+            identifier if identifier is not None else self.identifier,
+            flags if flags is not None else self.flags
+        )
+        if header_key != self._header_key:
+            self._header_key = header_key
+            self._header_cache = {
+                "destination": header_key[0],
+                "node": header_key[1],
+                "identifier": header_key[2],
+                "flags": header_key[3]
+            }
+        header = self._header_cache
 
-        payload = data.encode('utf-8')
         crc = self._crc16(payload) if self.enable_crc else None
 
-        msg = {
-            "type": "tx",
-            "from": self.node,
-            "data": data,
-            "meta": {
-                **header,
-                "tx_power": self.tx_power,
-                "timestamp": time.time(),
-                "crc": crc
+        self._flush_acks()  # keep wire ordering: queued ACKs go out first
+
+        # The TX schema is fixed, so simple ASCII payloads skip the dict
+        # build and serializer entirely and go out via a frame template
+        if data.isascii() and not _NEEDS_ESCAPE.search(data):
+            frame = (
+                f'{{"type":"tx","from":{self.node},"data":"{data}","meta":'
+                f'{{"destination":{header["destination"]},"node":{header["node"]},'
+                f'"identifier":{header["identifier"]},"flags":{header["flags"]},'
+                f'"tx_power":{self.tx_power},"timestamp":{time.time()},'
+                f'"crc":{"null" if crc is None else crc}}}}}\n'
+            )
+            self._sendall(frame.encode('ascii'))
+        else:
+            msg = {
+                "type": "tx",
+                "from": self.node,
+                "data": data,
+                "meta": {
+                    **header,
+                    "tx_power": self.tx_power,
+                    "timestamp": time.time(),
+                    "crc": crc
+                }
             }
-        }
-
-        self.sock.sendall((json.dumps(msg) + '\n').encode())
+            self._sendall(_dumps(msg) + b'\n')
         self._keep_listening = keep_listening  # mock internal receive state
 
     def receive(self, *, keep_listening=True, with_header=False, with_ack=False, timeout=None):
@@ -137,28 +371,29 @@ class SimulatedRFM9x:
         - bytearray or None
         """
         timeout = timeout if timeout is not None else self.receive_timeout
-        self.sock.settimeout(timeout)
 
         try:
-            raw = self.sock.recv(4096)
-            msg = json.loads(raw.decode())
+            raw = self._read_frame(timeout)
+            if raw is None:
+                self._flush_acks_if_drained()
+                return None
+            msg = _loads(raw)
 
             # Update telemetry
             self.last_rssi = msg.get("rssi", -90)
             self.last_snr = msg.get("snr", 0.0)
 
             payload = msg.get("data", "")
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
             header = msg.get("meta", {})
             received_crc = header.get("crc")
 
             if self.enable_crc and received_crc is not None:
-                if isinstance(payload, str):
-                    payload_bytes = payload.encode('utf-8')
-                else:
-                    payload_bytes = payload
-                computed_crc = self._crc16(payload_bytes)
+                computed_crc = self._crc16(payload)
                 if computed_crc != received_crc:
-                    print(f"[CRC ERROR] Received: {received_crc}, Computed: {computed_crc}")
+                    self._log(f"[CRC ERROR] Received: {received_crc}, Computed: {computed_crc}")
+                    self._flush_acks_if_drained()
                     return None
 
             # Respond with ACK if requested and not already an ACK
@@ -170,22 +405,35 @@ class SimulatedRFM9x:
                 )
 
             self._keep_listening = keep_listening  # mock internal receive state
+            # Every exit runs the hold-back check, not just the with_ack
+            # branch: a burst ending in a broadcast, an ACK frame, or a
+            # CRC failure must still release ACKs queued for earlier frames
+            self._flush_acks_if_drained()
 
             # Return payload with or without header
             if with_header:
-                return bytearray([
+                buf = bytearray(4 + len(payload))
+                _HEADER.pack_into(
+                    buf, 0,
                     header.get("destination", 0xFF),
                     header.get("node", 0xFF),
                     header.get("identifier", 0),
                     header.get("flags", 0)
-                ]) + bytearray(payload, 'utf-8')
+                )
+                buf[4:] = payload
+                return buf
 
-            return bytearray(payload, 'utf-8')
+            return bytearray(payload)
 
-        except socket.timeout:
-            return None
         except Exception as e:
-            print(f"[SimulatedRFM9x] Error receiving: {e}")
+            self._log(f"[SimulatedRFM9x] Error receiving: {e}")
+            try:
+                self._flush_acks()  # don't strand ACKs queued before the error
+            except OSError:
+                # Connection is dead; drop the queued ACKs rather than
+                # letting the flush raise out of receive(), which never
+                # raises. The senders will retry those packets anyway.
+                self._pending_acks.clear()
             return None
 
     def _send_ack(self, to_node, identifier, original_flags):
@@ -214,7 +462,25 @@ class SimulatedRFM9x:
         if self.ack_delay:
             time.sleep(self.ack_delay)
 
-        self.sock.sendall((json.dumps(ack_msg) + '\n').encode())
+        # Queue rather than send: when one recv burst carried several
+        # packets, all their ACKs leave in a single socket transfer
+        self._pending_acks.append(_dumps(ack_msg) + b'\n')
+
+    def _flush_acks_if_drained(self):
+        """Flush queued ACKs once no complete frame remains buffered.
+
+        Called on every receive() exit: ACKs are held back only while
+        more packets from the same burst are still waiting to be parsed,
+        so the last frame of a burst — whatever its type — releases them.
+        """
+        if self._pending_acks and self._rxbuf.find(b'\n', 0, self._rxlen) < 0:
+            self._flush_acks()
+
+    def _flush_acks(self):
+        """Send all coalesced ACK frames in one socket transfer."""
+        if self._pending_acks:
+            self._sendall(b''.join(self._pending_acks))
+            self._pending_acks.clear()
 
     def send_with_ack(self, data: bytes) -> bool:
         """
@@ -226,22 +492,254 @@ class SimulatedRFM9x:
         Returns:
         - bool: True if ACK received, False otherwise.
         """
+        # Broadcasts are never ACKed — skip the sequence bump and the
+        # whole retry machinery (broadcast is the default run_tx mode)
+        if self.destination == 0xFF:
+            self.send(data, keep_listening=True, flags=self.flags)
+            return True
+
         self.sequence_number = (self.sequence_number + 1) & 0xFF
         self.identifier = self.sequence_number
         retries = self.ack_retries
 
+        rto = self._ack_timeout()
         while retries > 0:
             self.send(data, keep_listening=True, identifier=self.identifier, flags=self.flags)
 
-            if self.destination == 0xFF:
+            start = time.monotonic()
+            if self._wait_for_ack(rto):
+                self._update_rtt(time.monotonic() - start)
                 return True
 
-            ack = self.receive(timeout=self.ack_wait, with_header=True)
+            retries -= 1
+            rto = min(rto * 2, self.ack_wait * 8)  # exponential backoff
+            # Randomized backoff before retransmitting — spent listening
+            # for a late ACK rather than sleeping with the radio deaf
+            if self._wait_for_ack(random.uniform(0, 0.1)):
+                self._update_rtt(time.monotonic() - start)
+                return True
 
+        return False
+
+    def _ack_timeout(self):
+        """Per-attempt ACK timeout: SRTT + 4*RTTVAR once measured."""
+        if self._srtt is None:
+            return self.ack_wait
+        return max(self._srtt + 4 * self._rttvar, 0.05)
+
+    def _update_rtt(self, sample):
+        """Fold an ACK round-trip sample into the smoothed estimate."""
+        if self._srtt is None:
+            self._srtt = sample
+            self._rttvar = sample / 2
+        else:
+            err = sample - self._srtt
+            self._srtt += err / 8
+            self._rttvar += (abs(err) - self._rttvar) / 4
+
+    def _wait_for_ack(self, timeout):
+        """
+        Listen until `timeout` seconds elapse or the matching ACK arrives.
+
+        Runs against a monotonic deadline so unrelated packets received in
+        the window don't cut the ACK wait short.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ack = self.receive(timeout=remaining, with_header=True)
             if ack and ack[3] & 0x80 and ack[2] == self.identifier:
                 return True
 
+
+class AsyncSimulatedRFM9x(SimulatedRFM9x):
+    """
+    asyncio variant of SimulatedRFM9x.
+
+    Lets one process host many simulated nodes as coroutines instead of
+    one process (or thread) per node:
+
+        rfm9x = AsyncSimulatedRFM9x()
+        rfm9x.node = 1
+        await rfm9x.connect()
+        await rfm9x.initialize()
+        await rfm9x.send(b"Hello")
+        msg = await rfm9x.receive(timeout=1.0)
+
+    Configuration attributes (node, location, frequency, tx_power, ...)
+    are shared with the synchronous class; only the I/O methods differ.
+    """
+
+    __slots__ = ('_asyncio', '_reader', '_writer')
+
+    def __init__(self, server_ip='localhost', server_port=5000, frequency=915.0):
+        import asyncio  # local: only async users pay for it
+        self._asyncio = asyncio
+        super().__init__(server_ip, server_port, frequency)
+
+    def _open_socket(self):
+        # Connection happens in connect() on the running event loop
+        self.sock = None
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        """Open the TCP connection to the simulation server."""
+        self._reader, self._writer = await self._asyncio.open_connection(*self.server)
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def initialize(self):
+        """Register this node with the simulation server."""
+        msg = {
+            "type": "register",
+            "node_id": self.node,
+            "location": self.location,
+            "frequency": self.frequency
+        }
+        self._writer.write(_dumps(msg) + b'\n')
+        await self._writer.drain()
+
+    async def send(self, data: bytes, *, keep_listening=False, destination=None,
+                   node=None, identifier=None, flags=None):
+        """Async counterpart of SimulatedRFM9x.send."""
+        if isinstance(data, (bytes, bytearray)):
+            payload = bytes(data)
+            data = payload.decode('utf-8')
+        else:
+            payload = data.encode('utf-8')
+
+        msg = {
+            "type": "tx",
+            "from": self.node,
+            "data": data,
+            "meta": {
+                "destination": destination if destination is not None else self.destination,
+                "node": node if node is not None else self.node,
+                "identifier": identifier if identifier is not None else self.identifier,
+                "flags": flags if flags is not None else self.flags,
+                "tx_power": self.tx_power,
+                "timestamp": time.time(),
+                "crc": self._crc16(payload) if self.enable_crc else None
+            }
+        }
+        self._writer.write(_dumps(msg) + b'\n')
+        await self._writer.drain()
+        self._keep_listening = keep_listening
+
+    async def receive(self, *, keep_listening=True, with_header=False,
+                      with_ack=False, timeout=None):
+        """Async counterpart of SimulatedRFM9x.receive."""
+        timeout = timeout if timeout is not None else self.receive_timeout
+        try:
+            raw = await self._asyncio.wait_for(self._reader.readline(), timeout)
+        except self._asyncio.TimeoutError:
+            return None
+        if not raw:
+            return None
+
+        try:
+            msg = _loads(raw)
+        except ValueError:
+            return None
+
+        self.last_rssi = msg.get("rssi", -90)
+        self.last_snr = msg.get("snr", 0.0)
+
+        payload = msg.get("data", "")
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        header = msg.get("meta", {})
+        received_crc = header.get("crc")
+
+        if self.enable_crc and received_crc is not None:
+            if self._crc16(payload) != received_crc:
+                return None
+
+        if with_ack and not (header.get("flags", 0) & 0x80) and header.get("destination") != 0xFF:
+            await self._send_ack(
+                to_node=header["node"],
+                identifier=header["identifier"],
+                original_flags=header["flags"]
+            )
+
+        self._keep_listening = keep_listening
+
+        if with_header:
+            buf = bytearray(4 + len(payload))
+            _HEADER.pack_into(
+                buf, 0,
+                header.get("destination", 0xFF),
+                header.get("node", 0xFF),
+                header.get("identifier", 0),
+                header.get("flags", 0)
+            )
+            buf[4:] = payload
+            return buf
+
+        return bytearray(payload)
+
+    async def _send_ack(self, to_node, identifier, original_flags):
+        """Async counterpart of SimulatedRFM9x._send_ack."""
+        ack_msg = {
+            "type": "tx",
+            "from": self.node,
+            "data": "!",
+            "meta": {
+                "destination": to_node,
+                "node": self.node,
+                "identifier": identifier,
+                "flags": original_flags | 0x80,
+                "tx_power": self.tx_power,
+                "timestamp": time.time()
+            }
+        }
+        if self.ack_delay:
+            await self._asyncio.sleep(self.ack_delay)
+        self._writer.write(_dumps(ack_msg) + b'\n')
+        await self._writer.drain()
+
+    async def send_with_ack(self, data: bytes) -> bool:
+        """Async counterpart of SimulatedRFM9x.send_with_ack."""
+        self.sequence_number = (self.sequence_number + 1) & 0xFF
+        self.identifier = self.sequence_number
+        retries = self.ack_retries
+
+        rto = self._ack_timeout()
+        while retries > 0:
+            await self.send(data, keep_listening=True,
+                            identifier=self.identifier, flags=self.flags)
+
+            if self.destination == 0xFF:
+                return True
+
+            start = time.monotonic()
+            if await self._wait_for_ack(rto):
+                self._update_rtt(time.monotonic() - start)
+                return True
+
             retries -= 1
-            time.sleep(self.ack_wait + random.uniform(0, 0.1))
+            rto = min(rto * 2, self.ack_wait * 8)
+            if await self._wait_for_ack(random.uniform(0, 0.1)):
+                self._update_rtt(time.monotonic() - start)
+                return True
 
         return False
+
+    async def _wait_for_ack(self, timeout):
+        """Async counterpart of SimulatedRFM9x._wait_for_ack."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ack = await self.receive(timeout=remaining, with_header=True)
+            if ack and ack[3] & 0x80 and ack[2] == self.identifier:
+                return True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
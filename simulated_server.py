@@ -19,16 +19,51 @@ Usage:
 """
 
 # ========================== IMPORTS ==========================
+import argparse
+import functools
+import heapq
+import itertools
+import logging.handlers
+import queue
+import selectors
 import socket
 import threading
-import json
 import random
 import time
 import signal
 import sys
 import logging
 import math
-from collections import defaultdict
+
+try:
+    import orjson as _json
+
+    def _dumps(obj):
+        return _json.dumps(obj)
+except ImportError:
+    import json as _json
+
+    # Reuse one compact encoder: json.dumps builds a fresh JSONEncoder per
+    # call, and the default separators/ASCII escaping cost bytes and time
+    _encode = _json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+    def _dumps(obj):
+        return _encode(obj).encode()
+
+_loads = _json.loads
+_JSONDecodeError = ValueError  # orjson and stdlib json both raise it
+
+# Per-thread RNG instances: the module-level random functions share one
+# Mersenne Twister, so concurrent client threads would contend on (and
+# interleave) its state.  Each thread gets its own generator instead.
+_thread_local = threading.local()
+
+
+def _rng():
+    rng = getattr(_thread_local, 'rng', None)
+    if rng is None:
+        rng = _thread_local.rng = random.Random()
+    return rng
 
 # ========================== CONFIGURATIONS ==========================
 DEFAULT_AQI = 50
@@ -39,6 +74,35 @@ TX_POWER_DBM = 23
 NOISE_FIGURE = 6
 BANDWIDTH = 125000  # Hz
 FREQUENCY_MHZ = 915  # LoRa frequency in MHz
+# Frequency term of the ITU free-space path loss: 20*log10(f_MHz)
+_FSPL_FREQ_TERM = 20 * math.log10(FREQUENCY_MHZ)
+# Thermal noise floor (dBm) = -174 + 10*log10(BW) plus receiver noise figure
+_NOISE_FLOOR_DBM = -174 + 10 * math.log10(BANDWIDTH) + NOISE_FIGURE
+# LoRa processing gain 10*log10(2^SF) and symbol time 2^SF/BW per SF,
+# precomputed once so the per-packet path avoids math.log10/2**sf
+_PROCESSING_GAIN_DB = {sf: 10 * math.log10(2 ** sf) for sf in range(7, 13)}
+_TSYM_S = {sf: (1 << sf) / BANDWIDTH for sf in range(7, 13)}
+# Weather-dependent noise addition (dB) and processing-delay factor,
+# keyed like WEATHER_ATTEN_DB_PER_KM
+_WEATHER_NOISE_DB = {
+    'clear': 0,
+    'fog': 0.5,
+    'light-rain': 1.0,
+    'moderate-rain': 2.0,
+    'heavy-rain': 3.5
+}
+_WEATHER_DELAY_FACTOR = {
+    'clear': 1.0,
+    'fog': 1.05,
+    'light-rain': 1.1,
+    'moderate-rain': 1.2,
+    'heavy-rain': 1.35
+}
+
+# Capture window for overlapping receptions, in ns: a frame arriving
+# within ~5 symbol times of an ongoing reception's onset can still grab
+# the receiver (preamble not yet locked); beyond that it is a collision.
+_CAPTURE_WINDOW_NS = {sf: int(5 * _TSYM_S[sf] * 1e9) for sf in range(7, 13)}
 
 # Based on Semtech SX1276 datasheet and field measurements
 SF_SENSITIVITY = {
@@ -71,6 +135,56 @@ SF_MAX_RANGE_KM = {
     12: 25
 }
 
+# Tuple views of the per-SF tables, indexed by sf-7 (clamped): the hot
+# path pays one bounds clamp plus an O(1) index instead of a hashed
+# dict lookup with a default
+_SF_SENSITIVITY_ARR = tuple(SF_SENSITIVITY[sf] for sf in range(7, 13))
+_SF_MIN_SNR_ARR = tuple(SF_SNR_RANGES[sf][0] for sf in range(7, 13))
+_SF_MAX_SNR_ARR = tuple(SF_SNR_RANGES[sf][1] for sf in range(7, 13))
+_SF_MAX_RANGE_ARR = tuple(SF_MAX_RANGE_KM[sf] for sf in range(7, 13))
+# SF7 is least interference-prone (shortest airtime), SF12 the most
+_SF_INTERFERENCE_ARR = (0.7, 0.8, 0.9, 1.0, 1.1, 1.2)
+
+
+_MASK64 = (1 << 64) - 1
+
+# exp(-x) lookup for x in [0, 10), 1024 entries (~0.01 step). The drop
+# and sigmoid penalties only need ~1% accuracy, so a table read beats a
+# libm call on the per-recipient path; out-of-range inputs fall back to
+# math.exp.
+_EXP_NEG_LUT = tuple(math.exp(-i / 102.4) for i in range(1024))
+
+
+def _exp_neg(x):
+    """Approximate exp(-x); exact fallback outside the table's range."""
+    if 0.0 <= x < 10.0:
+        return _EXP_NEG_LUT[int(x * 102.4)]
+    return math.exp(-x)
+
+
+
+def _mix(x):
+    """Deterministic 64-bit integer mixer (splitmix64 finalizer).
+
+    Used to derive stable pseudo-random terrain/multipath components from
+    packed integer inputs. Unlike hash() on a formatted string, this needs
+    no transient str allocation and is not perturbed by PYTHONHASHSEED,
+    so results are reproducible across server runs.
+    """
+    x &= _MASK64
+    x ^= x >> 33
+    x = (x * 0xFF51AFD7ED558CCD) & _MASK64
+    x ^= x >> 33
+    x = (x * 0xC4CEB9FE1A85EC53) & _MASK64
+    x ^= x >> 33
+    return x
+
+
+def _sf_index(sf):
+    """Clamp a spreading factor to an index into the _SF_*_ARR tables."""
+    return 0 if sf < 7 else 5 if sf > 12 else sf - 7
+
+
 # Weather attenuation (db/km) - values based on empirical RF propagation models
 WEATHER_ATTEN_DB_PER_KM = {
     'clear': 0.2,        # Even clear air has some attenuation
@@ -100,21 +214,256 @@ OBSTACLE_LOSS_DB = {
 }
 
 # ========================== LOGGER SETUP ==========================
+# The packet path only enqueues records; formatting and stream/file I/O
+# happen on the QueueListener's thread (started in SimulatorServer.start)
+_log_queue = queue.SimpleQueue()
+_log_formatter = logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s')
+_log_stream_handler = logging.StreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(_log_formatter)
+_log_file_handler = logging.FileHandler("simulation.log", mode='w')  # Overwrites each run
+_log_file_handler.setFormatter(_log_formatter)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_stream_handler, _log_file_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("simulation.log", mode='w')  # Overwrites each run
-    ]
+    format='%(message)s',  # real formatting happens on the listener side
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_logger = logging.getLogger()
+
+
+# ========================== PHYSICS KERNELS ==========================
+# Pure scalar kernels kept at module level so the per-packet hot path
+# avoids bound-method and attribute lookups; the SimulatorServer methods
+# below are thin wrappers kept for API compatibility.
+
+@functools.lru_cache(maxsize=256)
+def _scenario_consts(sf, weather_atten, obstacle_loss, aqi):
+    """
+    Partially evaluate the (sf, weather, obstacle, aqi) dependent terms of
+    _environmental_loss. A deployment uses only a handful of scenario
+    combinations, so these five constants come from an LRU cache instead
+    of being recomputed per recipient.
+    """
+    sfd = sf - 7
+    # Weather attenuation per km, with higher SF slightly more resilient
+    weather_factor = max(0.1, weather_atten * (1.0 - sfd * 0.01))
+    # Obstacle penetration: up to 15% better at SF12 than SF7
+    obstacle_term = obstacle_loss * (1.0 - sfd * 0.025) if obstacle_loss else 0.0
+    # AQI degradation per km (non-linear above AQI 50)
+    aqi_per_km = ((aqi - 50) / 50.0) ** 1.5 * 0.5 * (1.0 - sfd * 0.02) if aqi > 50 else 0.0
+    # Terrain roughness and multipath SF resistance factors
+    roughness_factor = 1.0 - sfd * 0.03
+    multipath_factor = (2.5 if obstacle_loss else 0.8) * (1.0 - sfd * 0.05)
+    return weather_factor, obstacle_term, aqi_per_km, roughness_factor, multipath_factor
+
+
+def _environmental_loss(from_id, to_id, distance_km, aqi, weather_atten, obstacle_loss, sf=7):
+    """
+    Calculate total signal loss (in dB) from transmitter to receiver, 
+    with SF-specific characteristics.
+    
+    Args:
+        from_id (int): Sender node ID
+        to_id (int): Receiver node ID
+        distance_km (float): Distance between nodes in kilometers.
+        aqi (int): Air Quality Index.
+        weather_atten (float): Weather attenuation in dB/km, already
+            resolved from WEATHER_ATTEN_DB_PER_KM.
+        obstacle_loss (float): Obstacle penetration loss in dB, already
+            resolved from OBSTACLE_LOSS_DB (0.0 = open).
+        sf (int): Spreading factor (7-12)
+
+    Returns:
+        float: Total environmental path loss in dB.
+    """
+    # Realistic minimum distance (set to 2 meters = 0.002 km)
+    min_distance_km = 0.002
+    
+    # Apply minimum path loss even at zero distance (device separation/antenna characteristics)
+    # This represents the mismatch and inefficiency in real-world radio systems
+    min_path_loss = 32.0
+    
+    # 1: Set a realistic minimum distance and enforce realistic close-range behavior
+    # Even at very close ranges, we never exceed realistic signal strength 
+    effective_distance_km = max(distance_km, min_distance_km)
+    
+    # Add a near-field attenuation factor for very close distances
+    # Real antennas don't follow the inverse square law in the near field
+    near_field_attenuation = 0
+    if distance_km < 0.010:  # Within 10 meters
+        # Progressive attenuation that increases as we get closer
+        near_field_attenuation = 15.0 * (1.0 - (distance_km / 0.010))
+    
+    # 2: Free-space path loss using ITU standard
+    # FSPL(dB) = 32.45 + 20*log10(distance_km) + 20*log10(frequency_MHz)
+    path_loss = 32.45 + 20 * math.log10(effective_distance_km) + _FSPL_FREQ_TERM
+    
+    # Add near-field component
+    path_loss += near_field_attenuation
+    
+    # 3-5: Weather attenuation, AQI degradation and obstacle penetration,
+    # folded into cached per-scenario constants (see _scenario_consts)
+    (weather_factor, obstacle_term, aqi_per_km,
+     roughness_factor, multipath_factor) = _scenario_consts(sf, weather_atten, obstacle_loss, aqi)
+    path_loss += (weather_factor + aqi_per_km) * effective_distance_km
+    path_loss += obstacle_term
+    
+    # 6: Earth curvature effect - significant beyond ~8km
+    # Affects all SFs similarly (physics of radio horizon)
+    if effective_distance_km > 8.0:
+        # Stronger effect as we approach radio horizon
+        curvature_loss = ((effective_distance_km - 8.0) / 17.0) ** 2 * 10.0
+        path_loss += curvature_loss
+        
+    # 7: Terrain roughness approximation - varies with distance
+    # Higher SF slightly better in rough terrain
+    if effective_distance_km > 1.0:
+        # Random but deterministic terrain effect, keyed on the distance
+        # bucketed to 0.1 km
+        roughness_seed = (_mix(int(effective_distance_km * 10)) & 1023) / 1024.0
+        base_roughness = roughness_seed * 3.0 * math.log(effective_distance_km + 1)
+        path_loss += base_roughness * roughness_factor
+        
+    # 8: Multipath fading - more pronounced in non-open environments,
+    # with SF-specific resistance (multipath_factor from _scenario_consts)
+    # Random but deterministic multipath component, keyed on the link pair
+    # and the distance bucketed to 0.01 km
+    multipath_seed = (_mix((from_id << 40) ^ (to_id << 20) ^ int(effective_distance_km * 100)) & 1023) / 1024.0
+    multipath_loss = multipath_factor * multipath_seed * 5.0
+    path_loss += multipath_loss
+    
+    # 9: Apply a constant minimum loss to ensure RSSI is realistic even at zero distance
+    return max(path_loss, min_path_loss)
+
+
+def _snr(noise_floor_dbm, rssi, sf, distance_km, weather_noise):
+    """
+    Calculate Signal-to-Noise Ratio based on:
+    1. RSSI (received signal strength)
+    2. Noise floor (thermal + environmental)
+    3. Distance-based noise increase
+    4. Weather-dependent noise factors
+    5. SF-specific processing gain
+
+    Args:
+        rssi (float): Received Signal Strength Indicator in dBm.
+        sf (int): Spreading factor (7–12).
+        distance_km (float): Distance between nodes in kilometers.
+        weather_noise (float): Weather noise addition in dB, already
+            resolved from _WEATHER_NOISE_DB.
+
+    Returns:
+        float: Calculated SNR value.
+    """
+    # 1. Base noise calculation from thermal noise floor
+    noise_power = noise_floor_dbm
+    
+    # 2. Environmental noise factors: weather increases noise
+    # (electrical storms, rain static, etc.) - resolved by the caller
+
+    # 3. Distance-based noise increase (urban/industrial sources)
+    # Noise tends to increase in more populated areas
+    if distance_km < 5.0:
+        # Short range likely means urban/industrial environment
+        urban_noise = 3.0 - (distance_km * 0.4)  # More noise in urban areas
+    else:
+        # Long range likely means rural environment
+        urban_noise = 1.0
+        
+    # 4. Aggregate noise components
+    noise_power += weather_noise
+    noise_power += urban_noise
+    
+    # 5. LoRa processing gain improves SNR for higher SF
+    # Processing gain = 10 * log10(2^SF)
+    processing_gain = _PROCESSING_GAIN_DB.get(sf) or 10 * math.log10(2 ** sf)
+    
+    # 6. Calculate raw SNR
+    raw_snr = rssi - noise_power
+
+    # Constrain final SNR to realistic bounds for the given SF
+    i = _sf_index(sf)
+    min_snr, max_snr = _SF_MIN_SNR_ARR[i], _SF_MAX_SNR_ARR[i]
+    
+    # 7. Apply SF processing gain to get effective SNR
+    # Higher SF has better processing gain but still constrained by physics
+    effective_snr = min(raw_snr + (processing_gain / 10), max_snr)  # Dampened processing gain effect
+    
+    # 8. Calculate realistic SNR degradation with distance - scales with SF 
+    # Higher SFs degrade more slowly with distance (key LoRa advantage)
+    sf_distance_factor = 0.45 - ((sf - 7) * 0.025)  # SF7: 0.45, SF12: 0.325
+    distance_degradation = sf_distance_factor * distance_km  # dB per km
+    realistic_snr = effective_snr - distance_degradation
+    
+    # 9. SNR decay curve specific to this SF
+    # Each SF has maximum theoretical range where it still works (soft limit)
+    max_range = _SF_MAX_RANGE_ARR[i]
+    if distance_km > max_range * 0.5:
+        # Calculate how far we are into the decay region (50%-100% of max range)
+        decay_progress = min(1.0, (distance_km - (max_range * 0.5)) / (max_range * 0.5))
+        # Apply non-linear decay curve as we approach max range
+        decay_factor = decay_progress ** 1.5  # Steeper drop-off as we approach max range
+        snr_range = max_snr - min_snr
+        max_possible_snr = max_snr - (decay_factor * snr_range)
+        realistic_snr = min(realistic_snr, max_possible_snr)
+    
+    # 10. Apply small Gaussian fading based on distance
+    # This reflects small-scale fading due to environment
+    fading_std_dev = 0.8 - ((sf - 7) * 0.05)  # SF7: 0.8dB jitter, SF12: 0.55dB
+    rng = _rng()
+    fading_component = rng.gauss(0, fading_std_dev)
+    realistic_snr += fading_component
+    
+    # 11. Final SNR is constrained to realistic range
+    # but can still fall below minimum (causing packet loss)
+    return realistic_snr + rng.uniform(-0.1, 0.1)
+
+
+def _snr_penalty_sigmoid(snr, snr_min, snr_max):
+    """
+    Map SNR to a delay penalty using a sigmoid curve.
+    
+    As SNR approaches minimum required value, decode time increases dramatically.
+    Provides more realistic modeling of receiver performance near sensitivity edge.
+
+    Args:
+        snr (float): Current SNR value.
+        snr_min (float): Minimum required SNR for the SF.
+        snr_max (float): Maximum typical SNR for the SF.
+
+    Returns:
+        float: Delay penalty in milliseconds.
+    """
+    # Center point of sigmoid is 1/3 of the way from min to max
+    mid_point = snr_min + (snr_max - snr_min) / 3
+    
+    # Steepness of curve - sharper near minimum SNR
+    k = 1.5
+    
+    # Maximum penalty (in ms) - approached as SNR nears minimum
+    max_penalty = 50
+    
+    # Sigmoid function: penalty = max_penalty / (1 + e^(k*(snr-mid)))
+    x = k * (snr - mid_point)
+    # 1/(1+e^x) rewritten around exp(-|x|) so the shared lookup table
+    # serves both branches
+    if x >= 0:
+        e = _exp_neg(x)
+        penalty = max_penalty * e / (1.0 + e)
+    else:
+        penalty = max_penalty / (1.0 + _exp_neg(-x))
+    
+    return penalty
+
 
 # ========================== SIMULATOR SERVER ==========================
 class SimulatorServer:
-    def __init__(self, host='0.0.0.0', port=5000, max_clients=5):
+    def __init__(self, host='0.0.0.0', port=5000, max_clients=5, legacy_io=False):
         self.host = host
         self.port = port
         self.max_clients = max_clients
+        self.legacy_io = legacy_io
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.settimeout(1.0)
@@ -122,18 +471,59 @@ class SimulatorServer:
         self.clients = {}
         self.node_locations = {}
         self.node_frequency = {}
+        # Pairwise distances (km), recomputed once at registration rather
+        # than per packet: node positions are static for a simulation run
+        self.pair_distance = {}
+        # Per-sender recipient cache: from_id -> [(nid, sock, distance_km)].
+        # Fuses the clients/node_frequency/pair_distance lookups done for
+        # every broadcast recipient into one prebuilt list; rebuilt lazily
+        # after any register/disconnect.
+        self._peers = {}
         self.rx_busy_until = {}
+        self.rx_onset_ns = {}
         self.lock = threading.Lock()
         self.stop_event = threading.Event()
         self.shutting_down = False
-        self.loss_streaks = defaultdict(int)
+        # Consecutive-loss counters per (from_id, to_id) link.  Entries are
+        # capped at 5 (the streak penalty saturates there) and removed on a
+        # successful delivery, so the dict stays bounded by the number of
+        # currently-lossy links instead of every pair ever seen.
+        self.loss_streaks = {}
         self.active_transmissions = 0
+        # Guards the in-flight counter's read-modify-write: the legacy
+        # backend updates it from concurrent handler threads
+        self._active_lock = threading.Lock()
         self.max_inflight_packets = 10
+        # Congestion and interference-base probabilities indexed by the
+        # integer in-flight count (clamped): replaces a divide plus square
+        # per drop decision with one tuple read
+        lut_len = self.max_inflight_packets * 4 + 1
+        self._cong_lut = tuple(
+            min((i / self.max_inflight_packets) ** 2, 1.0) * 0.5 for i in range(lut_len))
+        self._intf_lut = tuple(
+            0.03 * i / self.max_inflight_packets for i in range(lut_len))
         
-        # Thermal noise floor (dBm) = -174 + 10*log10(BW)
-        self.noise_floor_dbm = -174 + 10 * math.log10(BANDWIDTH) + NOISE_FIGURE
+        # Thermal noise floor (dBm), computed once at import
+        self.noise_floor_dbm = _NOISE_FLOOR_DBM
+
+        # Airtime lookup: payload length is bounded (<=255 bytes) and SF is
+        # 7..12, so the default-parameter airtime collapses to a 6x256
+        # table filled once here from the full formula
+        self._airtime_lut = [
+            [self._airtime_formula(length, sf) for length in range(256)]
+            for sf in range(7, 13)
+        ]
 
-    def should_drop(self, from_id, to_id, rssi, snr, sf, distance_km):
+        # Event-loop state: packets scheduled for future delivery
+        # (due_time, tiebreaker, node_id, socket, message, log fields)
+        self._delivery_heap = []
+        # Reactor bookkeeping: selector handle and per-connection state
+        # (read buffer, write backlog) for sockets it manages
+        self._sel = None
+        self._conn_state = {}
+        self._delivery_seq = itertools.count()
+
+    def should_drop(self, from_id, to_id, rssi, snr, sf, distance_km, active=None):
         """
         Calculate packet drop probability based on:
         - Congestion (active transmissions)
@@ -146,274 +536,119 @@ class SimulatorServer:
             bool: True if packet should be dropped, False otherwise.
         """
         key = (from_id, to_id)
+        rng = _rng()
+        i = _sf_index(sf)
 
         # 1. Below sensitivity threshold = guaranteed drop
-        if rssi < SF_SENSITIVITY[sf]:
+        if rssi < _SF_SENSITIVITY_ARR[i]:
             return True
             
         # 2. Below minimum SNR threshold = guaranteed drop 
-        min_snr, _ = SF_SNR_RANGES.get(sf, (-20, 5.0))
+        min_snr = _SF_MIN_SNR_ARR[i]
         if snr < min_snr:
             return True
             
         # 3. Above maximum theoretical range = high probability drop
-        max_range = SF_MAX_RANGE_KM.get(sf, 10.0)
+        max_range = _SF_MAX_RANGE_ARR[i]
         
         # Distance-based probability increases dramatically beyond max range
         distance_ratio = distance_km / max_range
         if distance_ratio > 1.0:
             # Exponential increase in drop probability beyond max range
             distance_prob = min(0.95, (distance_ratio - 1.0) ** 2 * 0.9)
-            if random.random() < distance_prob:
+            # Integer-threshold Bernoulli draw: 32 random bits vs prob * 2**32
+            if rng.getrandbits(32) < int(distance_prob * 4294967296.0):
                 return True
 
-        # 4. Congestion-based drop probability
-        inflight_ratio = self.active_transmissions / self.max_inflight_packets
-        congestion_prob = min(inflight_ratio * inflight_ratio, 1.0) * 0.5  # Quadratic scaling up to 50%
+        # 4. Congestion-based drop probability (in-flight count snapshotted
+        # once per transmission by the caller; re-read only for direct calls)
+        if active is None:
+            active = self.active_transmissions
+        if active >= len(self._cong_lut):
+            active = len(self._cong_lut) - 1
+        congestion_prob = self._cong_lut[active]  # Quadratic scaling up to 50%
 
         # 5. Streak penalty from history (bad links tend to stay bad)
-        streak_prob = min(self.loss_streaks[key] * 0.07, 0.35)  # Caps at 35%
+        streak_prob = self.loss_streaks.get(key, 0) * 0.07  # Caps at 35% (streak <= 5)
 
         # 6. SNR margin penalty (smaller margin = higher drop probability)
         snr_margin = snr - min_snr
         # Higher SF is more resilient to poor SNR margins
         snr_margin_factor = 4.0 + ((sf - 7) * 0.25)  # SF7: 4.0, SF12: 5.25
-        snr_prob = math.exp(-snr_margin / snr_margin_factor) * 0.6  # Exponential decay
+        snr_prob = _exp_neg(snr_margin / snr_margin_factor) * 0.6  # Exponential decay
 
         # 7. RSSI quality penalty
-        rssi_threshold = SF_SENSITIVITY[sf] + 5  # 5dB above sensitivity
+        rssi_threshold = _SF_SENSITIVITY_ARR[i] + 5  # 5dB above sensitivity
         rssi_margin = rssi - rssi_threshold
         rssi_prob = 0.0 if rssi_margin > 0 else min(abs(rssi_margin / 10), 1.0) * 0.4
 
         # 8. SF-specific interference probability
         # Higher SF more susceptible to interference but resistant to noise
         # This includes channel usage and co-SF interference
-        base_interference = 0.03 * self.active_transmissions / self.max_inflight_packets
-        sf_interference_factor = {
-            7: 0.7,  # Less affected (faster transmissions = less collision opportunity)
-            8: 0.8,
-            9: 0.9,
-            10: 1.0,
-            11: 1.1,
-            12: 1.2   # More affected (longer airtime = more collision opportunity)
-        }.get(sf, 1.0)
-        interference_prob = base_interference * sf_interference_factor
+        interference_prob = self._intf_lut[active] * _SF_INTERFERENCE_ARR[i]
         
         # 9. Total drop probability with random factor
         base_prob = congestion_prob + streak_prob + snr_prob + rssi_prob + interference_prob
         # Add some randomness but cap at 98%
         prob = min(base_prob, 0.98)
         
-        # Execute the drop decision
-        drop = random.random() < prob
+        # Execute the drop decision (integer-threshold draw, see above)
+        drop = rng.getrandbits(32) < int(prob * 4294967296.0)
 
-        # Update loss streak history
-        self.loss_streaks[key] = self.loss_streaks[key] + 1 if drop else 0
+        # Update loss streak history (cap at 5: 5 * 0.07 saturates the
+        # penalty; drop the entry entirely on success)
+        if drop:
+            streak = self.loss_streaks.get(key, 0)
+            if streak < 5:
+                self.loss_streaks[key] = streak + 1
+        else:
+            self.loss_streaks.pop(key, None)
         
         # Debug log for drop probability components
-        if random.random() < 0.05:  # Only log 5% of packets to avoid log spam
-            logging.debug(f"Drop probability factors: congestion={congestion_prob:.2f}, "
-                        f"streak={streak_prob:.2f}, snr={snr_prob:.2f}, rssi={rssi_prob:.2f}, "
-                        f"interference={interference_prob:.2f}, SF={sf}, "
-                        f"total={prob:.2f}, decision={'DROP' if drop else 'KEEP'}")
-            
+        # Only log 5% of packets to avoid log spam; the isEnabledFor guard
+        # plus %-style lazy args mean nothing is formatted (or even
+        # sampled) when debug logging is off
+        if _logger.isEnabledFor(logging.DEBUG) and rng.random() < 0.05:
+            _logger.debug(
+                "Drop probability factors: congestion=%.2f, streak=%.2f, "
+                "snr=%.2f, rssi=%.2f, interference=%.2f, SF=%d, total=%.2f, "
+                "decision=%s",
+                congestion_prob, streak_prob, snr_prob, rssi_prob,
+                interference_prob, sf, prob, 'DROP' if drop else 'KEEP')
+
         return drop
 
     
     def compute_environmental_loss(self, from_id, to_id, distance_km, aqi, weather, obstacle, sf=7):
-        """
-        Calculate total signal loss (in dB) from transmitter to receiver, 
-        with SF-specific characteristics.
-        
-        Args:
-            from_id (int): Sender node ID
-            to_id (int): Receiver node ID
-            distance_km (float): Distance between nodes in kilometers.
-            aqi (int): Air Quality Index.
-            weather (str): Weather condition key from lookup table.
-            obstacle (str): Obstacle type key from lookup table.
-            sf (int): Spreading factor (7-12)
-
-        Returns:
-            float: Total environmental path loss in dB.
-        """
-        # Realistic minimum distance (set to 2 meters = 0.002 km)
-        min_distance_km = 0.002
-        
-        # Apply minimum path loss even at zero distance (device separation/antenna characteristics)
-        # This represents the mismatch and inefficiency in real-world radio systems
-        min_path_loss = 32.0
-        
-        # 1: Set a realistic minimum distance and enforce realistic close-range behavior
-        # Even at very close ranges, we never exceed realistic signal strength 
-        effective_distance_km = max(distance_km, min_distance_km)
-        
-        # Add a near-field attenuation factor for very close distances
-        # Real antennas don't follow the inverse square law in the near field
-        near_field_attenuation = 0
-        if distance_km < 0.010:  # Within 10 meters
-            # Progressive attenuation that increases as we get closer
-            near_field_attenuation = 15.0 * (1.0 - (distance_km / 0.010))
-        
-        # 2: Free-space path loss using ITU standard
-        # FSPL(dB) = 32.45 + 20*log10(distance_km) + 20*log10(frequency_MHz)
-        path_loss = 32.45 + 20 * math.log10(effective_distance_km) + 20 * math.log10(FREQUENCY_MHZ)
-        
-        # Add near-field component
-        path_loss += near_field_attenuation
-        
-        # 3: Weather attenuation (rain, fog etc) in dB/km multiplied by distance
-        # Higher SF slightly more resilient to weather effects (longer symbol time)
-        weather_base = WEATHER_ATTEN_DB_PER_KM.get(weather, 0.2)
-        sf_weather_reduction = (sf - 7) * 0.01  # Small reduction for higher SF
-        weather_factor = max(0.1, weather_base * (1.0 - sf_weather_reduction))
-        path_loss += weather_factor * effective_distance_km
-        
-        # 4: AQI-based atmospheric degradation (non-linear effect)
-        if aqi > 50:
-            # Non-linear scaling - higher AQI has increasingly worse effect
-            # Higher SF slightly more resilient to particulate interference
-            aqi_factor = ((aqi - 50) / 50.0) ** 1.5
-            sf_aqi_reduction = (sf - 7) * 0.02  # Small reduction for higher SF
-            path_loss += aqi_factor * 0.5 * effective_distance_km * (1.0 - sf_aqi_reduction)
-            
-        # 5: Add obstacle penetration loss from empirical dB table
-        # Higher SF has better obstacle penetration
-        obstacle_loss = OBSTACLE_LOSS_DB.get(obstacle, 0.0)
-        if obstacle != "open":
-            # Up to 15% better penetration at SF12 compared to SF7
-            sf_penetration_factor = 1.0 - ((sf - 7) * 0.025)  # SF7: 1.0, SF12: 0.875
-            path_loss += obstacle_loss * sf_penetration_factor
-        else:
-            path_loss += obstacle_loss
-        
-        # 6: Earth curvature effect - significant beyond ~8km
-        # Affects all SFs similarly (physics of radio horizon)
-        if effective_distance_km > 8.0:
-            # Stronger effect as we approach radio horizon
-            curvature_loss = ((effective_distance_km - 8.0) / 17.0) ** 2 * 10.0
-            path_loss += curvature_loss
-            
-        # 7: Terrain roughness approximation - varies with distance
-        # Higher SF slightly better in rough terrain
-        if effective_distance_km > 1.0:
-            # Random but deterministic terrain effect
-            roughness_seed = hash(f"{effective_distance_km:.1f}") % 1000 / 1000.0
-            base_roughness = roughness_seed * 3.0 * math.log(effective_distance_km + 1)
-            sf_roughness_reduction = (sf - 7) * 0.03  # Small reduction for higher SF
-            roughness_loss = base_roughness * (1.0 - sf_roughness_reduction)
-            path_loss += roughness_loss
-            
-        # 8: Multipath fading - affects signal more in complex environments
-        # Higher SF has better resistance to multipath effects
-        if obstacle != "open":
-            # More pronounced in non-open environments
-            base_multipath = 2.5
-        else:
-            # Still present in open areas but less intense
-            base_multipath = 0.8
-        
-        # SF-specific multipath resistance
-        multipath_factor = base_multipath * (1.0 - ((sf - 7) * 0.05))  # SF7: full effect, SF12: 75% effect
-        
-        # Random but deterministic multipath component
-        multipath_seed = hash(f"{from_id}{to_id}{effective_distance_km:.2f}") % 1000 / 1000.0
-        multipath_loss = multipath_factor * multipath_seed * 5.0
-        path_loss += multipath_loss
-        
-        # 9: Apply a constant minimum loss to ensure RSSI is realistic even at zero distance
-        return max(path_loss, min_path_loss)
+        """Calculate total environmental path loss in dB (see _environmental_loss)."""
+        return _environmental_loss(
+            from_id, to_id, distance_km, aqi,
+            WEATHER_ATTEN_DB_PER_KM.get(weather, 0.2),
+            OBSTACLE_LOSS_DB.get(obstacle, 0.0), sf)
 
     def compute_snr(self, rssi, sf, distance_km, weather, obstacle):
-        """
-        Calculate Signal-to-Noise Ratio based on:
-        1. RSSI (received signal strength)
-        2. Noise floor (thermal + environmental)
-        3. Distance-based noise increase
-        4. Weather-dependent noise factors
-        5. SF-specific processing gain
-
-        Args:
-            rssi (float): Received Signal Strength Indicator in dBm.
-            sf (int): Spreading factor (7–12).
-            distance_km (float): Distance between nodes in kilometers.
-            weather (str): Weather condition key.
-            obstacle (str): Obstacle key.
+        """Calculate the received SNR in dB (see _snr)."""
+        return _snr(self.noise_floor_dbm, rssi, sf, distance_km,
+                    _WEATHER_NOISE_DB.get(weather, 0))
 
-        Returns:
-            float: Calculated SNR value.
+    def compute_airtime_ms(self, payload_len, sf=7, bw=125000, cr=1, preamble_len=8, header_enabled=True, low_datarate_optimize=None):
         """
-        # 1. Base noise calculation from thermal noise floor
-        noise_power = self.noise_floor_dbm
-        
-        # 2. Environmental noise factors
-        # Weather increases noise (electrical storms, rain static, etc.)
-        weather_noise_addition = {
-            'clear': 0,
-            'fog': 0.5,
-            'light-rain': 1.0,
-            'moderate-rain': 2.0,
-            'heavy-rain': 3.5
-        }
-        
-        # 3. Distance-based noise increase (urban/industrial sources)
-        # Noise tends to increase in more populated areas
-        if distance_km < 5.0:
-            # Short range likely means urban/industrial environment
-            urban_noise = 3.0 - (distance_km * 0.4)  # More noise in urban areas
-        else:
-            # Long range likely means rural environment
-            urban_noise = 1.0
-            
-        # 4. Aggregate noise components
-        noise_power += weather_noise_addition.get(weather, 0)
-        noise_power += urban_noise
-        
-        # 5. LoRa processing gain improves SNR for higher SF
-        # Processing gain = 10 * log10(2^SF)
-        processing_gain = 10 * math.log10(2**sf)
-        
-        # 6. Calculate raw SNR
-        raw_snr = rssi - noise_power
+        Compute the airtime (in milliseconds) for a given LoRa packet.
 
-        # Constrain final SNR to realistic bounds for the given SF
-        min_snr, max_snr = SF_SNR_RANGES.get(sf, (-20, 5.0))
-        
-        # 7. Apply SF processing gain to get effective SNR
-        # Higher SF has better processing gain but still constrained by physics
-        effective_snr = min(raw_snr + (processing_gain / 10), max_snr)  # Dampened processing gain effect
-        
-        # 8. Calculate realistic SNR degradation with distance - scales with SF 
-        # Higher SFs degrade more slowly with distance (key LoRa advantage)
-        sf_distance_factor = 0.45 - ((sf - 7) * 0.025)  # SF7: 0.45, SF12: 0.325
-        distance_degradation = sf_distance_factor * distance_km  # dB per km
-        realistic_snr = effective_snr - distance_degradation
-        
-        # 9. SNR decay curve specific to this SF
-        # Each SF has maximum theoretical range where it still works (soft limit)
-        max_range = SF_MAX_RANGE_KM.get(sf, 10.0)
-        if distance_km > max_range * 0.5:
-            # Calculate how far we are into the decay region (50%-100% of max range)
-            decay_progress = min(1.0, (distance_km - (max_range * 0.5)) / (max_range * 0.5))
-            # Apply non-linear decay curve as we approach max range
-            decay_factor = decay_progress ** 1.5  # Steeper drop-off as we approach max range
-            snr_range = max_snr - min_snr
-            max_possible_snr = max_snr - (decay_factor * snr_range)
-            realistic_snr = min(realistic_snr, max_possible_snr)
-        
-        # 10. Apply small Gaussian fading based on distance
-        # This reflects small-scale fading due to environment
-        fading_std_dev = 0.8 - ((sf - 7) * 0.05)  # SF7: 0.8dB jitter, SF12: 0.55dB
-        fading_component = random.gauss(0, fading_std_dev)
-        realistic_snr += fading_component
-        
-        # 11. Final SNR is constrained to realistic range
-        # but can still fall below minimum (causing packet loss)
-        return realistic_snr + random.uniform(-0.1, 0.1)
+        For the default radio parameters (the only ones the simulator
+        uses per packet) this is a precomputed table lookup; the full
+        formula below only runs for callers overriding them.
+        """
+        if (bw == 125000 and cr == 1 and preamble_len == 8 and header_enabled
+                and low_datarate_optimize is None
+                and 7 <= sf <= 12 and 0 <= payload_len <= 255):
+            return self._airtime_lut[sf - 7][payload_len]
+        return self._airtime_formula(payload_len, sf, bw, cr, preamble_len,
+                                     header_enabled, low_datarate_optimize)
 
-    def compute_airtime_ms(self, payload_len, sf=7, bw=125000, cr=1, preamble_len=8, header_enabled=True, low_datarate_optimize=None):
+    def _airtime_formula(self, payload_len, sf=7, bw=125000, cr=1, preamble_len=8, header_enabled=True, low_datarate_optimize=None):
         """
-        Compute the airtime (in milliseconds) for a given LoRa packet.
+        Full LoRa airtime formula (in milliseconds).
         Improved version based on LoRaWAN standard and Semtech documentation.
 
         Args:
@@ -428,8 +663,9 @@ class SimulatorServer:
         Returns:
             float: Estimated airtime in milliseconds.
         """
-        # 1: Symbol duration calculation (Ts = 2^SF / BW)
-        tsym = (2 ** sf) / bw
+        # 1: Symbol duration calculation (Ts = 2^SF / BW), table-driven for
+        # the default bandwidth
+        tsym = _TSYM_S[sf] if bw == BANDWIDTH and sf in _TSYM_S else (2 ** sf) / bw
         
         # 2: Low data rate optimization enable flag - automatic for SF11 and SF12
         # per LoRaWAN regional parameters
@@ -458,35 +694,11 @@ class SimulatorServer:
         return t_air
 
     def snr_penalty_sigmoid(self, snr, snr_min, snr_max):
-        """
-        Map SNR to a delay penalty using a sigmoid curve.
-        
-        As SNR approaches minimum required value, decode time increases dramatically.
-        Provides more realistic modeling of receiver performance near sensitivity edge.
-
-        Args:
-            snr (float): Current SNR value.
-            snr_min (float): Minimum required SNR for the SF.
-            snr_max (float): Maximum typical SNR for the SF.
-
-        Returns:
-            float: Delay penalty in milliseconds.
-        """
-        # Center point of sigmoid is 1/3 of the way from min to max
-        mid_point = snr_min + (snr_max - snr_min) / 3
-        
-        # Steepness of curve - sharper near minimum SNR
-        k = 1.5
-        
-        # Maximum penalty (in ms) - approached as SNR nears minimum
-        max_penalty = 50
-        
-        # Sigmoid function: penalty = max_penalty / (1 + e^(k*(snr-mid)))
-        penalty = max_penalty / (1.0 + math.exp(k * (snr - mid_point)))
-        
-        return penalty
+        """Map SNR to a delay penalty in ms (see _snr_penalty_sigmoid)."""
+        return _snr_penalty_sigmoid(snr, snr_min, snr_max)
     
-    def calculate_transmission_delay(self, snr, sf, weather, distance_km, obstacle, payload_len):
+    def calculate_transmission_delay(self, snr, sf, weather, distance_km, obstacle, payload_len, airtime_ms=None,
+                                     weather_delay_base=None, obstacle_loss=None):
         """
         Calculate the realistic transmission delay for a LoRa packet.
         Accounts for SF-specific characteristics in delay calculations.
@@ -498,42 +710,47 @@ class SimulatorServer:
             distance_km (float): Distance between nodes in km.
             obstacle (str): Obstacle type.
             payload_len (int): Payload length in bytes.
+            airtime_ms (float): Precomputed airtime; broadcasts pass it in
+                once instead of recomputing it per recipient.
+            weather_delay_base (float): Pre-resolved _WEATHER_DELAY_FACTOR
+                entry; looked up from ``weather`` when None.
+            obstacle_loss (float): Pre-resolved OBSTACLE_LOSS_DB entry;
+                looked up from ``obstacle`` when None.
 
         Returns:
             float: Total delay in milliseconds.
         """
         # 1. Physical airtime (time-on-air) - core component
         # Coding rate (CR) is typically 4/5 for standard LoRa
-        coding_rate = 1
-        airtime_ms = self.compute_airtime_ms(payload_len, sf=sf, cr=coding_rate)
+        if airtime_ms is None:
+            coding_rate = 1
+            airtime_ms = self.compute_airtime_ms(payload_len, sf=sf, cr=coding_rate)
         
         # 2. Propagation delay (speed of light) - minor but realistic
         # RF travels at ~300,000 km/s, so 3.33μs per km
         propagation_delay_ms = (distance_km / 300000) * 1000
         
         # 3. SNR-based decoding delay (harder to decode weak signals)
-        min_snr, max_snr = SF_SNR_RANGES.get(sf, (-20, 5.0))
+        i = _sf_index(sf)
+        min_snr, max_snr = _SF_MIN_SNR_ARR[i], _SF_MAX_SNR_ARR[i]
         snr_penalty_ms = self.snr_penalty_sigmoid(snr, min_snr, max_snr)
         
         # 4. Weather-based delay effects - slightly less impact on higher SF
-        weather_base = {
-            'clear': 1.0,
-            'fog': 1.05,
-            'light-rain': 1.1,
-            'moderate-rain': 1.2,
-            'heavy-rain': 1.35
-        }.get(weather, 1.0)
+        if weather_delay_base is None:
+            weather_delay_base = _WEATHER_DELAY_FACTOR.get(weather, 1.0)
         
         # Higher SF slightly more resilient to weather
         sf_weather_reduction = (sf - 7) * 0.01  # Small reduction for higher SF
-        weather_factor = weather_base * (1.0 - sf_weather_reduction)
+        weather_factor = weather_delay_base * (1.0 - sf_weather_reduction)
         
         # 5. Obstacle effect on signal quality and thus processing time
         # Higher SF works better through obstacles
+        if obstacle_loss is None:
+            obstacle_loss = OBSTACLE_LOSS_DB.get(obstacle, 0.0)
         obstacle_factor = 1.0
-        if obstacle != "open":
+        if obstacle_loss:
             # Non-open environments increase processing complexity
-            base_obstacle_factor = 1.0 + (OBSTACLE_LOSS_DB.get(obstacle, 0.0) / 50.0)
+            base_obstacle_factor = 1.0 + (obstacle_loss / 50.0)
             # SF-specific obstacle handling (higher SF = better penetration)
             sf_obstacle_reduction = (sf - 7) * 0.02  # Small reduction for higher SF
             obstacle_factor = base_obstacle_factor * (1.0 - sf_obstacle_reduction)
@@ -547,7 +764,7 @@ class SimulatorServer:
         
         # 8. Random jitter for realism (hardware/stack timing variance)
         # Higher SF is more susceptible to timing jitter
-        jitter_ms = random.uniform(0.5, 3.0) * (sf / 7.0)  # More jitter at higher SF
+        jitter_ms = _rng().uniform(0.5, 3.0) * (sf / 7.0)  # More jitter at higher SF
         
         # 9. Calculate total delay
         total_delay_ms = (airtime_ms + 
@@ -558,12 +775,12 @@ class SimulatorServer:
         
         return total_delay_ms
     
-    def get_drop_reason(self, now, rssi, sf, nid, snr, min_snr, from_id, distance_km):
+    def get_drop_reason(self, now_ns, rssi, sf, nid, snr, min_snr, from_id, distance_km, active=None):
         """
         Determine specific reason for packet drop, if any.
-        
+
         Args:
-            now (float): Current timestamp.
+            now_ns (int): Current time.monotonic_ns() timestamp.
             rssi (float): Received signal strength.
             sf (int): Spreading factor.
             nid (int): Target node ID.
@@ -574,12 +791,11 @@ class SimulatorServer:
         Returns:
             str or None: Drop reason or None if no drop.
         """
-        # 1. Check for ongoing reception/collision
-        if now < self.rx_busy_until.get(nid, 0):
-            return "COLLISION"
-            
-        # 2. Check if below hardware sensitivity threshold
-        if rssi < SF_SENSITIVITY[sf]:
+        # Note: the reception-overlap/collision window is checked by the
+        # caller before any physics is computed (see _process_transmission).
+
+        # 1. Check if below hardware sensitivity threshold
+        if rssi < _SF_SENSITIVITY_ARR[_sf_index(sf)]:
             return "RSSI_TOO_LOW"
             
         # 3. Check if SNR is below minimum required for demodulation
@@ -587,9 +803,11 @@ class SimulatorServer:
             return "SNR_TOO_LOW"
             
         # 4. Check if general packet drop conditions apply (statistical)
-        if self.should_drop(from_id, nid, rssi, snr, sf, distance_km):
+        if active is None:
+            active = self.active_transmissions
+        if self.should_drop(from_id, nid, rssi, snr, sf, distance_km, active):
             # Determine more specific reason for the drop
-            if self.active_transmissions > self.max_inflight_packets * 0.8:
+            if active > self.max_inflight_packets * 0.8:
                 return "NETWORK_CONGESTION"
             elif self.loss_streaks.get((from_id, nid), 0) > 3:
                 return "PERSISTENT_LINK_FAILURE"
@@ -607,48 +825,88 @@ class SimulatorServer:
         """
         self.shutdown()
 
+    def _handle_message(self, conn, msg):
+        """
+        Dispatch one decoded client message (both I/O backends).
+
+        Returns the node ID if the message was a registration, else None.
+        """
+        if msg["type"] == "register":
+            node_id = msg["node_id"]
+            location = tuple(msg.get("location", (0, 0)))
+            frequency = msg["frequency"]
+            with self.lock:
+                # Copy-on-write: build the new registry and rebind the
+                # attribute, so broadcast threads iterating the old dict
+                # never see a mutation mid-scan and need no lock to read
+                clients = dict(self.clients)
+                clients[node_id] = conn
+                self.node_locations[node_id] = location
+                self.node_frequency[node_id] = frequency
+                for other_id, other_loc in self.node_locations.items():
+                    dist = math.dist(location, other_loc)
+                    self.pair_distance[(node_id, other_id)] = dist
+                    self.pair_distance[(other_id, node_id)] = dist
+                self.clients = clients
+                self._peers = {}
+            logging.info(f"[+] RFM9x Node {node_id} registered at {location} with frequency: {frequency}")
+            return node_id
+        if msg["type"] == "tx":
+            self._process_transmission(msg)
+        return None
+
+    def _drop_client(self, conn, node_id):
+        """Deregister and close one client connection (both backends)."""
+        if node_id:
+            with self.lock:
+                # Copy-on-write removal, mirroring the register path
+                clients = dict(self.clients)
+                clients.pop(node_id, None)
+                self.clients = clients
+                self._peers = {}
+        try:
+            conn.shutdown(socket.SHUT_RDWR)
+        except:
+            pass
+        conn.close()
+        logging.info(f"[-] Node {node_id} disconnected")
+
     def _handle_client(self, conn, addr):
         """
         Handle communication from a single simulated LoRa node.
-        
+
         Handles:
         - Node registration with coordinates
         - Packet transmissions with metadata
         - Disconnect and cleanup
 
-        Runs in its own thread per connection.
+        Runs in its own thread per connection (--legacy-io backend).
         """
-        conn_file = conn.makefile('r')
         logging.info(f"[+] Connected from {addr}")
         node_id = None
         conn.settimeout(None)
+        buf = bytearray()
         try:
-            for line in conn_file:
-                try:
-                    msg = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if msg["type"] == "register":
-                    node_id = msg["node_id"]
-                    location = tuple(msg.get("location", (0, 0)))
-                    frequency = msg["frequency"]
-                    with self.lock:
-                        self.clients[node_id] = conn
-                        self.node_locations[node_id] = location
-                        self.node_frequency[node_id] = frequency
-                    logging.info(f"[+] RFM9x Node {node_id} registered at {location} with frequency: {frequency}")
-                elif msg["type"] == "tx":
-                    self._process_transmission(msg)
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+                while True:
+                    nl = buf.find(b'\n')
+                    if nl < 0:
+                        break
+                    line = bytes(buf[:nl])
+                    del buf[:nl + 1]
+                    try:
+                        msg = _loads(line)
+                    except _JSONDecodeError:
+                        continue
+                    node_id = self._handle_message(conn, msg) or node_id
+        except OSError:
+            pass
         finally:
-            if node_id:
-                with self.lock:
-                    self.clients.pop(node_id, None)
-            try:
-                conn.shutdown(socket.SHUT_RDWR)
-            except:
-                pass
-            conn.close()
-            logging.info(f"[-] Node {node_id} disconnected")
+            self._drop_client(conn, node_id)
 
     def _process_transmission(self, msg):
         """
@@ -669,24 +927,76 @@ class SimulatorServer:
         meta = msg.get("meta", {})
         from_id = msg.get("from")
         to_id = meta.get("destination")
+        # Unlocked snapshot reads: self.clients and self._peers are rebound
+        # (never mutated in place) by the register/disconnect paths. _peers
+        # is read first: registration rebinds clients before invalidating
+        # _peers, so this pairing can see an old cache with a new registry
+        # (fills land in the discarded dict, harmless) but never a new
+        # cache filled from a stale registry
+        peers = self._peers
+        clients = self.clients
         from_loc = self.node_locations.get(from_id, (0, 0))
         tx_dbm = meta.get("tx_power", TX_POWER_DBM)
         aqi = meta.get("aqi", DEFAULT_AQI)
         weather = meta.get("weather", DEFAULT_WEATHER)
         obstacle = meta.get("obstacle", DEFAULT_OBSTACLE)
+        # Resolve the per-message string keys to floats once; the recipient
+        # loop then works purely with numbers
+        weather_atten = WEATHER_ATTEN_DB_PER_KM.get(weather, 0.2)
+        weather_noise = _WEATHER_NOISE_DB.get(weather, 0)
+        weather_delay_base = _WEATHER_DELAY_FACTOR.get(weather, 1.0)
+        obstacle_loss = OBSTACLE_LOSS_DB.get(obstacle, 0.0)
         sf = meta.get("sf", DEFAULT_SPREAD_FACTOR)
         payload_len = len(msg.get("data", ""))
-        min_snr, max_snr = SF_SNR_RANGES.get(sf, (-20, 5.0))
+        sf_i = _sf_index(sf)
+        min_snr, max_snr = _SF_MIN_SNR_ARR[sf_i], _SF_MAX_SNR_ARR[sf_i]
+        # Beyond twice the SF's soft max range the link budget is hopeless
+        # (statistical drop saturates and RSSI lands under sensitivity), so
+        # recipients past this gate skip the physics entirely
+        hard_range_km = _SF_MAX_RANGE_ARR[sf_i] * 2.0
         sender_freq = self.node_frequency.get(from_id)
+        # Airtime depends only on (payload_len, sf): one lookup per
+        # transmission, shared by every broadcast recipient
+        airtime_ms = self.compute_airtime_ms(payload_len, sf=sf)
+
+        # Bind the per-recipient steps to locals once: the broadcast loop
+        # then calls the physics kernels directly instead of going through
+        # bound-method wrappers and repeated attribute lookups
+        env_loss = _environmental_loss
+        snr_of = _snr
+        noise_floor = self.noise_floor_dbm
+        delay_of = self.calculate_transmission_delay
+        drop_reason_of = self.get_drop_reason
+        rng_uniform = _rng().uniform
+        rx_busy_until = self.rx_busy_until
+        rx_onset_ns = self.rx_onset_ns
+        # Serialize the frame once per transmission; recipients differ only
+        # in rssi/snr, which are appended as a small JSON suffix per target
+        frame_prefix = _dumps(msg)[:-1]  # drop the closing brace
 
-        self.active_transmissions += 1
+        # Snapshot the in-flight count once under the counter lock: every
+        # recipient of this transmission sees the same congestion state,
+        # without re-reading the shared counter per target
+        with self._active_lock:
+            self.active_transmissions += 1
+            active = self.active_transmissions
+        # Event-loop backend: delivery is deferred to the heap, so the
+        # in-flight window must span the scheduled airtime rather than
+        # this synchronous call (which would pin the count at 1). Each
+        # scheduled frame ticks txn down; popping the last one in
+        # _flush_due_deliveries releases the counter.
+        txn = None if self.legacy_io else [0]
         try:
             if to_id != 0xFF:
                 # Unicast mode - specific target
-                client_sock = self.clients.get(to_id)
+                client_sock = clients.get(to_id)
                 receiver_freq = self.node_frequency.get(to_id)
                 if client_sock and sender_freq == receiver_freq:
-                    targets = [(to_id, client_sock)]
+                    distance_km = self.pair_distance.get((from_id, to_id))
+                    if distance_km is None:
+                        to_loc = self.node_locations.get(to_id, (0, 0))
+                        distance_km = math.dist(from_loc, to_loc)
+                    targets = [(to_id, client_sock, distance_km)]
                 elif client_sock:
                     logging.warning(f"[DROP] FREQ_MISMATCH: Node {from_id} → Node {to_id} | {sender_freq} MHz ≠ {receiver_freq} MHz")
                     return
@@ -694,19 +1004,49 @@ class SimulatorServer:
                     logging.warning(f"[DROP] INVALID_DESTINATION: Node {to_id} not registered or offline")
                     return
             else:
-                # Broadcast mode with frequency check
-                targets = [
-                    (nid, sock)
-                    for nid, sock in self.clients.items()
-                    if nid != from_id and sock is not None and self.node_frequency.get(nid) == sender_freq
-                ]
-                
-            for nid, client_sock in targets:
-                to_loc = self.node_locations.get(nid, (0, 0))
-                distance_km = math.dist(from_loc, to_loc)
-                
+                # Broadcast mode: cached per-sender recipient list with
+                # frequency filter and pair distance already resolved
+                targets = peers.get(from_id)
+                if targets is None:
+                    targets = [
+                        (nid, sock, self.pair_distance.get((from_id, nid), 0.0))
+                        for nid, sock in clients.items()
+                        if nid != from_id and sock is not None and self.node_frequency.get(nid) == sender_freq
+                    ]
+                    # Fill the snapshotted cache, not self._peers: if a
+                    # register rebound the registry since the snapshot,
+                    # this list predates the new node and must not land
+                    # in the fresh cache
+                    peers[from_id] = targets
+
+            for nid, client_sock, distance_km in targets:
+                # Out-of-range gate before any physics
+                if distance_km > hard_range_km:
+                    if _logger.isEnabledFor(logging.WARNING):
+                        _logger.warning("[DROP] OUT_OF_RANGE: Packet from %s to %s | "
+                                        "SF: %s | Distance: %.2f km > %.0f km",
+                                        from_id, nid, sf, distance_km, hard_range_km)
+                    continue
+
+                # Collision window check first: if the receiver is mid-frame
+                # and past the capture window for this SF, the packet is lost
+                # regardless of signal quality, so skip the physics entirely.
+                now_ns = time.monotonic_ns()
+                if now_ns < rx_busy_until.get(nid, 0):
+                    dt_ns = now_ns - rx_onset_ns.get(nid, 0)
+                    if dt_ns > _CAPTURE_WINDOW_NS.get(sf, 0):
+                        if _logger.isEnabledFor(logging.WARNING):
+                            _logger.warning("[DROP] COLLISION: Packet from %s to %s | "
+                                            "SF: %s | Distance: %.2f km | "
+                                            "overlap %d ms into reception",
+                                            from_id, nid, sf, distance_km,
+                                            dt_ns // 1_000_000)
+                        continue
+                    # Within the capture window the radio re-locks onto the
+                    # stronger/newer preamble; fall through to normal physics.
+
                 # Calculate signal parameters
-                path_loss = self.compute_environmental_loss(from_id, nid, distance_km, aqi, weather, obstacle, sf)
+                path_loss = env_loss(from_id, nid, distance_km, aqi, weather_atten, obstacle_loss, sf)
                 
                 # Apply realistic RSSI limits - even with zero path loss, should never exceed -35dBm
                 # This accounts for receiver front-end limitations and antenna inefficiencies
@@ -714,65 +1054,266 @@ class SimulatorServer:
                 min_realistic_rssi = -150  # dBm - physical lower bound
                 
                 # Calculate RSSI with realistic bounds
-                rssi = min(max_realistic_rssi, max(min_realistic_rssi, tx_dbm - path_loss)) + random.uniform(-1.5, 1.5)
+                rssi = min(max_realistic_rssi, max(min_realistic_rssi, tx_dbm - path_loss)) + rng_uniform(-1.5, 1.5)
                 
                 # Calculate SNR based on the realistic RSSI
-                snr = self.compute_snr(rssi, sf, distance_km, weather, obstacle)
+                snr = snr_of(noise_floor, rssi, sf, distance_km, weather_noise)
                 
                 # Calculate transmission delay
-                delay_ms = self.calculate_transmission_delay(snr, sf, weather, distance_km, obstacle, payload_len)
+                delay_ms = delay_of(snr, sf, weather, distance_km, obstacle, payload_len, airtime_ms,
+                                    weather_delay_base, obstacle_loss)
                 
-                now = time.time()
-                drop_reason = self.get_drop_reason(now, rssi, sf, nid, snr, min_snr, from_id, distance_km)
+                drop_reason = drop_reason_of(now_ns, rssi, sf, nid, snr, min_snr, from_id, distance_km, active)
                 
                 if drop_reason:
-                    logging.warning(f"[DROP] {drop_reason}: Packet from {from_id} to {nid} | "
-                                f"RSSI: {rssi:.2f} dBm | SNR: {snr:.2f} dB | "
-                                f"SF: {sf} | Distance: {distance_km:.2f} km | Delay: {delay_ms} ms")
+                    if _logger.isEnabledFor(logging.WARNING):
+                        _logger.warning("[DROP] %s: Packet from %s to %s | "
+                                        "RSSI: %.2f dBm | SNR: %.2f dB | "
+                                        "SF: %s | Distance: %.2f km | Delay: %s ms",
+                                        drop_reason, from_id, nid, rssi, snr,
+                                        sf, distance_km, delay_ms)
                     continue
 
                 # Mark receiver as busy for the duration of reception
-                self.rx_busy_until[nid] = now + delay_ms / 1000.0
-                
-                # Add received signal parameters to message
-                msg["rssi"] = round(rssi, 2)
-                msg["snr"] = round(snr, 2)
-                
-                # Simulate transmission delay
-                time.sleep(delay_ms/1000)
-                
-                # Deliver message to receiver
-                try:
-                    client_sock.sendall((json.dumps(msg) + '\n').encode())
-                    logging.info(f"[✓] Delivered packet from {from_id} to {nid} | "
-                            f"RSSI: {rssi:.2f} dBm | SNR: {snr:.2f} dB | "
-                            f"SF: {sf} | Distance: {distance_km:.2f} km | Delay: {delay_ms:.2f} ms")
-                except Exception as e:
-                    logging.warning(f"[x] Send failed to Node {nid}: {e}")
+                # (integer nanoseconds on the monotonic clock)
+                rx_onset_ns[nid] = now_ns
+                rx_busy_until[nid] = now_ns + int(delay_ms * 1_000_000)
+
+                # Add received signal parameters: reuse the shared prefix
+                # and close the object with a per-target suffix. Values are
+                # truncated to centi-dB (the extra precision is simulation
+                # jitter anyway).
+                wire = frame_prefix + (
+                    ',"rssi":%.2f,"snr":%.2f}\n' % (int(rssi * 100) / 100.0,
+                                                    int(snr * 100) / 100.0)).encode()
+
+                log_line = None
+                if _logger.isEnabledFor(logging.INFO):
+                    log_line = (f"[✓] Delivered packet from {from_id} to {nid} | "
+                                f"RSSI: {rssi:.2f} dBm | SNR: {snr:.2f} dB | "
+                                f"SF: {sf} | Distance: {distance_km:.2f} km | Delay: {delay_ms:.2f} ms")
+                self._deliver(nid, client_sock, wire, delay_ms, log_line, txn)
         finally:
-            self.active_transmissions -= 1
+            # Legacy backend delivers inline above, so the transmission is
+            # over here; on the event loop the heap flush releases the
+            # counter — unless nothing was scheduled (all targets dropped)
+            if txn is None or txn[0] == 0:
+                with self._active_lock:
+                    self.active_transmissions -= 1
+
+    def _deliver(self, nid, client_sock, wire, delay_ms, log_line, txn):
+        """
+        Deliver one pre-serialized packet after its simulated delay.
+
+        Event-loop backend: schedule it on the delivery heap so the loop
+        keeps serving other nodes while the packet is "in the air"; `txn`
+        counts this transmission's frames still on the heap.
+        Legacy backend: block this client's thread, as before.
+        """
+        if not self.legacy_io:
+            due = time.monotonic() + delay_ms / 1000.0
+            txn[0] += 1
+            heapq.heappush(self._delivery_heap,
+                           (due, next(self._delivery_seq), nid, client_sock, wire, log_line, txn))
+            return
+
+        # Simulate transmission delay
+        time.sleep(delay_ms / 1000)
+        self._send_frame(nid, client_sock, wire, log_line)
+
+    def _send_frame(self, nid, client_sock, wire, log_line):
+        """Send one pre-serialized frame to a client, logging the outcome."""
+        try:
+            client_sock.sendall(wire)
+            if log_line:
+                logging.info(log_line)
+        except Exception as e:
+            logging.warning(f"[x] Send failed to Node {nid}: {e}")
 
     def start(self):
         """
         Start the server loop:
         - Accept TCP connections
-        - Launch threads for client
+        - Serve all clients from one selector-driven event loop
+          (or one thread per client with --legacy-io)
         - Handle Ctrl+C for shutdown
         """
+        _log_listener.start()
         logging.info(f"[~] Starting improved simulator server on {self.host}:{self.port} ...")
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(self.max_clients)
         signal.signal(signal.SIGINT, self._handle_signal)
         try:
-            while not self.stop_event.is_set():
-                try:
-                    conn, addr = self.server_socket.accept()
-                    threading.Thread(target=self._handle_client, args=(conn, addr), daemon=True).start()
-                except socket.timeout:
-                    continue
+            if self.legacy_io:
+                self._serve_threaded()
+            else:
+                self._serve_event_loop()
         finally:
             self.shutdown()
 
+    @staticmethod
+    def _tune_conn(conn):
+        """Disable Nagle and widen the kernel buffers on a client socket."""
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if hasattr(socket, 'TCP_QUICKACK'):  # Linux: ack incoming frames immediately
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+
+    def _serve_threaded(self):
+        """Legacy backend: one blocking handler thread per client."""
+        while not self.stop_event.is_set():
+            try:
+                conn, addr = self.server_socket.accept()
+                self._tune_conn(conn)
+                threading.Thread(target=self._handle_client, args=(conn, addr), daemon=True).start()
+            except socket.timeout:
+                continue
+
+    def _serve_event_loop(self):
+        """
+        Default backend: a single reactor thread multiplexing every client
+        over selectors (epoll on Linux). Transmission delays never sleep —
+        deliveries sit on a heap and the selector timeout is clamped to
+        the next due packet, so one busy link can't stall the others.
+        """
+        self.server_socket.setblocking(False)
+        sel = self._sel = selectors.DefaultSelector()
+        sel.register(self.server_socket, selectors.EVENT_READ, None)
+
+        while not self.stop_event.is_set():
+            timeout = 1.0
+            if self._delivery_heap:
+                timeout = min(1.0, max(0.0, self._delivery_heap[0][0] - time.monotonic()))
+            for key, mask in sel.select(timeout):
+                if key.data is None:
+                    try:
+                        conn, addr = self.server_socket.accept()
+                    except OSError:
+                        continue
+                    self._tune_conn(conn)
+                    conn.setblocking(False)
+                    state = {"addr": addr, "buf": bytearray(), "out": bytearray(),
+                             "writable": False, "node_id": None}
+                    self._conn_state[conn] = state
+                    sel.register(conn, selectors.EVENT_READ, state)
+                    logging.info(f"[+] Connected from {addr}")
+                else:
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush_out(key.fileobj, key.data)
+                    if mask & selectors.EVENT_READ:
+                        self._service_conn(sel, key.fileobj, key.data)
+            self._flush_due_deliveries()
+
+    def _service_conn(self, sel, conn, state):
+        """Read whatever a client has ready and dispatch complete frames."""
+        try:
+            chunk = conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            chunk = b''
+        if not chunk:
+            sel.unregister(conn)
+            self._conn_state.pop(conn, None)
+            self._drop_client(conn, state["node_id"])
+            return
+
+        buf = state["buf"]
+        buf += chunk
+        while True:
+            newline = buf.find(b'\n')
+            if newline < 0:
+                break
+            line = bytes(buf[:newline])
+            del buf[:newline + 1]
+            try:
+                msg = _loads(line)
+            except _JSONDecodeError:
+                continue
+            node_id = self._handle_message(conn, msg)
+            if node_id is not None:
+                state["node_id"] = node_id
+
+    def _queue_send(self, conn, data):
+        """
+        Write to a reactor-managed client without ever blocking the loop.
+
+        Tries an immediate non-blocking send; whatever the kernel buffer
+        refuses is parked in the connection's backlog and drained when the
+        selector reports the socket writable again. A client whose socket
+        isn't reactor-managed (legacy backend) falls back to sendall.
+        """
+        state = self._conn_state.get(conn)
+        if state is None:
+            conn.sendall(data)
+            return
+        out = state["out"]
+        if out:
+            out += data
+        else:
+            try:
+                sent = conn.send(data)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            if sent < len(data):
+                out += data[sent:]
+        if out and not state["writable"]:
+            self._sel.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE, state)
+            state["writable"] = True
+
+    def _flush_out(self, conn, state):
+        """Drain a connection's write backlog once the socket is writable."""
+        out = state["out"]
+        try:
+            sent = conn.send(out)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            return
+        del out[:sent]
+        if not out and state["writable"]:
+            self._sel.modify(conn, selectors.EVENT_READ, state)
+            state["writable"] = False
+
+    def _flush_due_deliveries(self):
+        """
+        Send every scheduled packet whose simulated airtime has elapsed.
+
+        Frames due in the same tick for the same node are concatenated and
+        written with one sendall, so a burst costs one syscall per client
+        rather than one per packet.
+        """
+        now = time.monotonic()
+        heap = self._delivery_heap
+        if not heap or heap[0][0] > now:
+            return
+        batches = {}  # nid -> [client_sock, buffer, log_lines]
+        done = 0  # transmissions whose last scheduled frame just landed
+        while heap and heap[0][0] <= now:
+            _, _, nid, client_sock, wire, log_line, txn = heapq.heappop(heap)
+            txn[0] -= 1
+            if txn[0] == 0:
+                done += 1
+            batch = batches.get(nid)
+            if batch is None:
+                batch = batches[nid] = [client_sock, bytearray(), []]
+            batch[1] += wire
+            if log_line:
+                batch[2].append(log_line)
+        if done:
+            # These transmissions are off the air: release the congestion
+            # counter they held since _process_transmission scheduled them
+            with self._active_lock:
+                self.active_transmissions -= done
+        for nid, (client_sock, buf, log_lines) in batches.items():
+            try:
+                self._queue_send(client_sock, buf)
+                for log_line in log_lines:
+                    logging.info(log_line)
+            except Exception as e:
+                logging.warning(f"[x] Send failed to Node {nid}: {e}")
+
     def shutdown(self):
         """
         Cleanly shutdown the server and all connected clients.
@@ -795,9 +1336,21 @@ class SimulatorServer:
         except:
             pass
         logging.info("[✓] Server shutdown complete.")
+        try:
+            _log_listener.stop()  # flush queued records before exiting
+        except RuntimeError:
+            pass  # listener never started (e.g. bind failed)
         sys.exit(0)
 
 
 if __name__ == "__main__":
-    server = SimulatorServer()
+    parser = argparse.ArgumentParser(description="LoRa RFM9x Simulator Server")
+    parser.add_argument("--legacy-io", action="store_true",
+                        help="Serve with the old thread-per-client backend")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only log errors (maximum packet throughput)")
+    args = parser.parse_args()
+    if args.quiet:
+        _logger.setLevel(logging.ERROR)
+    server = SimulatorServer(legacy_io=args.legacy_io)
     server.start()
\ No newline at end of file